@@ -7,15 +7,22 @@ A module that implements the Knuth-Plass text formatting algorithm in Python.
 This Implementation of the Knuth-Plass algorithm is much faster than the
     implementations in knuth_plass and knuth_plass2 with larger inputs
 """
-from typing import List, Callable, Union, Dict, Generator, Any
-from collections import namedtuple
+from typing import List, Union, Generator, Any, NamedTuple, Optional
+from enum import IntEnum
+from numbers import Real
+from itertools import accumulate, repeat
+from concurrent.futures import ProcessPoolExecutor
 from tools import profile
 
-class JUSTIFY:
-    LEFT = "LEFT"
-    RIGHT = "RIGHT"
-    CENTER = "CENTER"
-    FULL = "FULL"
+class JUSTIFY(IntEnum):
+    LEFT = 0
+    RIGHT = 1
+    CENTER = 2
+    FULL = 3
+
+# Maps the name of each justification to its JUSTIFY constant so that
+#   justifications can also be given as strings
+_JUSTIFY_LOOKUP = {j.name: j for j in JUSTIFY}
 
 WHITESPACE_CHARS = ' \t\r\n\f\v'
 WHITESPACE = set(ch for ch in WHITESPACE_CHARS)
@@ -23,6 +30,13 @@ Num = Union[int, float]
 INF = 10000
 GLUE, BOX, PENALTY = 1, 2, 3
 
+# The shared Specs handed out by Glue.intern, Box.intern, and Penalty.intern,
+#   keyed by the arguments they were made with and their types (so that, for
+#   example, Box.intern(1) and Box.intern(1.0) are different Boxes)
+_GLUE_CACHE    = {}
+_BOX_CACHE     = {}
+_PENALTY_CACHE = {}
+
 # =============================================================================
 # Specifications (Glue, Box, Penalty)
 # -----------------------------------------------------------------------------
@@ -35,6 +49,7 @@ class Specification:
     shrink  = default_shrink  = 0.0  # z in the paper; the amount this glue can shrink its width by
     penalty = default_penalty = 0.0  # p in the paper; the amount to be penalized if use this penalty
     flagged = default_flagged = 0    # f in the paper; used to say whether a hyphen will need to be put here. Is either 1 for True or 0 for False
+    forced  = default_forced  = False # whether this is a forced break (a penalty of -infinity)
 
     def is_glue(self):         return False
     def is_box(self):          return False
@@ -46,7 +61,7 @@ class Glue(Specification):
     Glue refers to blank space that can vary its width in specified ways; it is
         an elastic mortar used between boxes in a typeset line.
     """
-    __slots__ = ['width', 'stretch', 'shrink']
+    __slots__ = ['width', '_stretch', '_shrink', '_pair']
     t = GLUE
 
     def __init__(self, shrink:Num, width:Num, stretch:Num):
@@ -64,25 +79,55 @@ class Glue(Specification):
             changed the parameters to be in order "shrink, width, stretch"
             instead.
         """
-        self.shrink: Num  = shrink
-        self.width: Num   = width
-        self.stretch: Num = stretch
+        self._shrink: Num  = shrink
+        self.width: Num    = width
+        self._stretch: Num = stretch
+
+        # What r is multiplied by in r_width, indexed by whether r >= 0 (kept
+        #   up to date by the shrink and stretch setters)
+        self._pair = (shrink, stretch)
+
+    @property
+    def shrink(self):
+        return self._shrink
+
+    @shrink.setter
+    def shrink(self, shrink:Num):
+        self._shrink = shrink
+        self._pair = (shrink, self._stretch)
+
+    @property
+    def stretch(self):
+        return self._stretch
+
+    @stretch.setter
+    def stretch(self, stretch:Num):
+        self._stretch = stretch
+        self._pair = (self._shrink, stretch)
 
     def r_width(self, r):
         """
         Returns the width of this glue for the given ratio r.
         """
-        if r < 0:
-            # As r is negative, will be subtracting width
-            return self.width + (r * self.shrink)
-        else:
-            # r is positive, so will be adding width (or r is 0 and so adding nothing)
-            return self.width + (r * self.stretch)
+        # If r is negative, it subtracts width using the shrink. Otherwise it
+        #   adds width using the stretch (or r is 0 and so adds nothing)
+        return self.width + (r * self._pair[r >= 0])
 
-    def is_glue(self): return True
+    @classmethod
+    def intern(cls, shrink:Num, width:Num, stretch:Num):
+        """
+        Returns the shared Glue with the given shrink, width, and stretch,
+            creating it the first time it is asked for. Interned Specs are
+            shared by everything that asks for them so they must not be
+            changed (use Glue(...) for a Glue of your own).
+        """
+        key = (type(shrink), shrink, type(width), width, type(stretch), stretch)
+        glue = _GLUE_CACHE.get(key)
+        if glue is None:
+            glue = _GLUE_CACHE[key] = cls(shrink, width, stretch)
+        return glue
 
-    def copy(self):
-        return Glue(self.shrink, self.width, self.stretch)
+    def is_glue(self): return True
 
     def __repr__(self):
         return f'<{self.__class__.__name__}(width={self.width}, stretch={self.stretch}, shrink={self.shrink})>'
@@ -103,10 +148,21 @@ class Box(Specification):
     def __init__(self, width:Num):
         self.width: Num = width # The fixed width of the box (so width of what is in the box with that actualy value being stored in the KnuthPlassParagraph alongside it)
 
-    def is_box(self): return True
+    @classmethod
+    def intern(cls, width:Num):
+        """
+        Returns the shared Box with the given width, creating it the first time
+            it is asked for. Interned Specs are shared by everything that asks
+            for them so they must not be changed (use Box(...) for a Box of
+            your own).
+        """
+        key = (type(width), width)
+        box = _BOX_CACHE.get(key)
+        if box is None:
+            box = _BOX_CACHE[key] = cls(width)
+        return box
 
-    def copy(self):
-        return Box(self.width)
+    def is_box(self): return True
 
     def __repr__(self):
         return f'<{self.__class__.__name__}(width={self.width})>'
@@ -121,19 +177,39 @@ class Penalty(Specification):
         a hyphen if you want to add a hyphen here because you are breaking off
         a word.
     """
-    __slots__ = ['width', 'penalty', 'flagged']
+    __slots__ = ['width', '_penalty', 'flagged', 'forced']
     t = PENALTY
 
     def __init__(self, width:Num, penalty:Num, flagged:bool):
         self.width: Num   = width   # Width of extra typeset material (width of the hyphen)
-        self.penalty: Num = penalty # The penalty to breaking here
+        self.penalty: Num = penalty # The penalty to breaking here (also sets self.forced)
         self.flagged: Num = flagged # Whether there is a hyphen here
 
-    def is_penalty(self): return True
-    def is_forced_break(self): (self.penalty >= INF)
+    @property
+    def penalty(self):
+        return self._penalty
 
-    def copy(self):
-        return Penalty(self.width, self.penalty, self.flagged)
+    @penalty.setter
+    def penalty(self, penalty:Num):
+        self._penalty = penalty
+        self.forced = (penalty <= -INF) # Whether a break must happen here (computed when the penalty is set so the algorithm can just read it)
+
+    @classmethod
+    def intern(cls, width:Num, penalty:Num, flagged:bool):
+        """
+        Returns the shared Penalty with the given width, penalty, and flagged
+            value, creating it the first time it is asked for. Interned Specs
+            are shared by everything that asks for them so they must not be
+            changed (use Penalty(...) for a Penalty of your own).
+        """
+        key = (type(width), width, type(penalty), penalty, type(flagged), flagged)
+        pen = _PENALTY_CACHE.get(key)
+        if pen is None:
+            pen = _PENALTY_CACHE[key] = cls(width, penalty, flagged)
+        return pen
+
+    def is_penalty(self): return True
+    def is_forced_break(self): return self.forced
 
     def __repr__(self):
         return f'<{self.__class__.__name__}(width={self.width}, penalty={self.penalty}, flagged={self.flagged})>'
@@ -144,29 +220,413 @@ Spec = Union[Glue, Box, Penalty]
 # Helper Class for KnuthPlassParagraph
 # -----------------------------------------------------------------------------
 
-class Break:
+class Break(NamedTuple):
     """
     A class representing a break in the text as calculated by the Knuth-Plass
     algorithm.
     """
+    position: int              # Index in the Knuth-Plass paragraph this break occurs (excludes i in last line, includes i on this current line)
+    line: int                  # What line of the resulting paragraph this break creates
+    fitness_class: int         # The fitness class of this break
+    demerits: float            # How 'bad' this break is
+    ratio: float               # The ratio used to get the actual width of glues for this line if trying to full justify the line
+    desired_line_length: Num   # The line length that this line is supposed to be if all glues are expanded by the adjustment ratio `ratio`
+    previous: Optional['Break'] = None # The previous break that had to occur to get this one
+
+    # Breaks compare and hash by identity like any other object. Comparing
+    #   them as tuples would also compare their whole chain of previous
+    #   breaks, which recurses once per line of the paragraph.
+    def __eq__(self, other): return self is other
+    def __ne__(self, other): return self is not other
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}(pos={self.position}, line={self.line}, fitness_class={self.fitness_class}, demerits={self.demerits}, ratio={self.ratio}, desired_line_length={self.desired_line_length})>"
+
+class BreakArrays:
+    """
+    Holds the breaks found while running the Knuth-Plass algorithm as a
+        Structure of Arrays: each field of a Break is kept in its own array and
+        a break is referred to by its id, the index of its fields in those
+        arrays. The `previous` array holds the id of the previous break of each
+        break (-1 if there is none).
+
+    NOTE: the arrays are plain lists rather than `array.array`s because an
+        `array.array` has to box every value read out of it and cannot hold
+        the None desired_line_length of the break that starts the paragraph.
+    """
     __slots__ = ["position", "line", "fitness_class", "demerits", "ratio", "desired_line_length", "previous"]
-    def __init__(self, position:int, line:int, fitness_class:int, demerits:float, ratio:float, desired_line_length:float, previous=None):
-        self.position      = position      # Index in the Knuth-Plass paragraph this break occurs (excludes i in last line, includes i on this current line)
-        self.line          = line          # What line of the resulting paragraph this break creates
-        self.fitness_class = fitness_class # The fitness class of this break
-        self.demerits      = demerits      # How 'bad' this break is
-        self.ratio         = ratio         # The ratio used to get the actual width of glues for this line if trying to full justify the line
-        self.desired_line_length = desired_line_length # The line length that this line is supposed to be if all glues are expanded by the adjustment ratio `ratio`
-        self.previous      = previous      # The previous break that had to occur to get this one
+    def __init__(self):
+        self.position            = []
+        self.line                = []
+        self.fitness_class       = []
+        self.demerits            = []
+        self.ratio               = []
+        self.desired_line_length = []
+        self.previous            = []
 
-    def key(self):
-        return (self.line, self.fitness_class, self.position)
+    def __len__(self):
+        return len(self.position)
 
-    def copy(self):
-        return Break(self.position, self.line, self.fitness_class, self.demerits, self.ratio, self.previous)
+    def alloc(self, position:int, line:int, fitness_class:int, demerits:float, ratio:float, desired_line_length:Num, previous:int=-1):
+        """
+        Adds a break with the given fields and returns its id.
+        """
+        self.position.append(position)
+        self.line.append(line)
+        self.fitness_class.append(fitness_class)
+        self.demerits.append(demerits)
+        self.ratio.append(ratio)
+        self.desired_line_length.append(desired_line_length)
+        self.previous.append(previous)
+        return len(self.position) - 1
+
+    def chain(self, i:int):
+        """
+        Returns a list of Break objects for the break with the given id and
+            every break that had to come before it, in the order that they
+            occur in the paragraph.
+        """
+        ids = []
+        while i != -1:
+            ids.append(i)
+            i = self.previous[i]
+
+        chain = []
+        previous = None
+        for i in reversed(ids):
+            previous = Break(self.position[i], self.line[i], self.fitness_class[i], self.demerits[i], self.ratio[i], self.desired_line_length[i], previous)
+            chain.append(previous)
+        return chain
 
-    def __repr__(self):
-        return f"<{self.__class__.__name__}(pos={self.position}, line={self.line}, fitness_class={self.fitness_class}, demerits={self.demerits}, ratio={self.ratio}, desired_line_length={self.desired_line_length})>"
+# =============================================================================
+# Knuth-Plass Kernel
+# -----------------------------------------------------------------------------
+
+def knuth_plass_kernel(sum_width:List[Num], sum_stretch:List[Num],
+        sum_shrink:List[Num], widths:List[Num], penalties:List[Num],
+        flagged:List[int], forced:List[bool], types:List[int], line_lengths:List[Num],
+        looseness:int, tolerance:int, fitness_demerit:Num,
+        flagged_demerit:Num):
+    """
+    The numeric core of the Knuth-Plass breaks algorithm. It only works on the
+        flat per-position arrays of a paragraph (see
+        KnuthPlassParagraph.to_arrays) and the running sums of its widths,
+        stretches, and shrinks (see
+        KnuthPlassParagraph.calc_knuth_plass_breaks) so it never touches a
+        Spec object.
+
+    Returns the BreakArrays holding every break found along with the id of
+        the chosen break at the end of the paragraph. See
+        KnuthPlassParagraph.calc_knuth_plass_breaks for what the rest of the
+        arguments mean.
+    """
+    m = len(types)
+
+    # Partition the positions of the paragraph by the type of their Spec so
+    #   that each of the precomputations below only looks at the positions
+    #   it cares about
+    penalty_positions = [i for i, t in enumerate(types) if t == PENALTY]
+    glue_positions    = [i for i, t in enumerate(types) if t == GLUE]
+
+    # The width of the typeset material added to a line if it breaks at
+    #   each position (only Penalties add any, such as a hyphen)
+    penalty_width_at = [0] * m
+    for i in penalty_positions:
+        penalty_width_at[i] = widths[i]
+
+    # Every break found by the algorithm. Nodes are the ids of breaks in it.
+    brks = BreakArrays()
+    positions       = brks.position
+    lines           = brks.line
+    fitness_classes = brks.fitness_class
+    demerits_of     = brks.demerits
+    alloc           = brks.alloc
+
+    A = brks.alloc(position=0, line=0, fitness_class=1, demerits=0, ratio=1, desired_line_length=None)
+
+    # The active nodes are kept in a doubly linked list threaded through
+    #   these arrays by node id (-1 marks either end of the list). The list
+    #   is sorted by line number and, within a line, the newest node comes
+    #   first.
+    next_active = [-1]
+    prev_active = [-1]
+    head = tail = A
+
+    # Indexed by line number: the first (newest) active node of each line
+    #   (-1 if it has none) and how many active nodes that line has. Line
+    #   numbers are small and dense so lists are used instead of dicts.
+    line_first = [A]
+    line_count = [1]
+    num_active_lines = 1 # How many lines have any active nodes
+
+    # Used to easily see if a node is already accounted for so that we do
+    #   not look at the same Break twice. Holds the (line, fitness_class,
+    #   position) key of each active node.
+    active_nodes_set = {(0, 1, 0)}
+
+    # Find every feasible breakpoint up front so that the main loop only
+    #   ever visits the positions it can actually break at. A Penalty is
+    #   feasible if it is less than infinitely bad and a Glue is feasible
+    #   if it directly follows a Box.
+    feasible_breakpoints = sorted(
+            [i for i in penalty_positions if penalties[i] < INF] +
+            [i for i in glue_positions if i > 0 and types[i-1] == BOX]
+        )
+
+    # The length of every line the paragraph could possibly have (it cannot
+    #   have more lines than feasible breakpoints); if the line_lengths list
+    #   is too short, the last value is always used for subsequent lines.
+    max_lines = len(feasible_breakpoints) + 1
+    line_widths = list(line_lengths[:max_lines])
+    line_widths.extend([line_lengths[-1]] * (max_lines - len(line_widths)))
+
+    breaks_to_deactivate = [] # List of breaks that were feasible but no longer are
+    breaks_to_activate   = [] # List of newly-found feasible breaks
+
+    # Bound once so that the inner loop does not look the methods up again
+    #   for every active node
+    deactivate = breaks_to_deactivate.append
+    activate   = breaks_to_activate.append
+
+    # The node with the fewest demerits out of the ones that end the
+    #   paragraph, kept up to date as they are activated (-1 if none has
+    #   been found yet)
+    best_end = -1
+    for i in feasible_breakpoints:
+        B_penalty = penalties[i]
+        B_flagged = flagged[i]
+        forced_break = forced[i]
+
+        # Everything about B that is needed to measure a line ending at it is
+        #   the same for every active node, so only look it up once
+        B_sum_width     = sum_width[i]
+        B_sum_stretch   = sum_stretch[i]
+        B_sum_shrink    = sum_shrink[i]
+        B_penalty_width = penalty_width_at[i]
+
+        # Loop over the list of active nodes, and compute the fitness
+        # of the line formed by breaking at A and B
+        A = head
+        prev_line = -1
+        while A != -1:
+            A_position = positions[A]
+            A_line     = lines[A]
+
+            # -- Compute the adjustment ratio r for the line between A and B.
+            #   This is how much you would have to shrink (if r < 0) or
+            #   stretch (if r > 0) the line we are currently looking at in
+            #   order to make it fit exactly the current line (make it have
+            #   the exact same length as the current line).
+            ideal_width = B_sum_width - sum_width[A_position] + B_penalty_width
+
+            # Get the length of the current line. The active nodes are sorted
+            # by line so it only has to be looked up when the line changes.
+            if A_line != prev_line:
+                prev_line = A_line
+                desired_line_length = line_widths[A_line]
+
+            # Compute how much the contents of the line would have to be
+            # stretched or shrunk to fit into the available space.
+            if ideal_width < desired_line_length:
+                # You would have to stretch this line if you want it to fit on
+                #   the desired line. y is the total amount of stretch (in
+                #   whatever units all the parts of the paragraph are measured
+                #   in) you can stretch this line by.
+                y = B_sum_stretch - sum_stretch[A_position]
+                r = (desired_line_length - ideal_width) / y if y > 0 else INF
+
+            elif ideal_width > desired_line_length:
+                # Must shrink the line by removing space from glue if you want
+                #   it to fit on the line. z is the total amount you could
+                #   possibly shrink this line by.
+                z = B_sum_shrink - sum_shrink[A_position]
+                r = (desired_line_length - ideal_width) / z if z > 0 else INF
+
+            else:
+                # Exactly the right length!
+                r = 0
+
+            if (r < -1 or forced_break):
+                # Deactivate node A
+                deactivate(A)
+
+            # A line can always end at a forced break as long as it is not
+            #   too long (even if it has to be stretched more than the
+            #   tolerance allows) since the break has to happen there anyway.
+            #   Only the stretch side is let through: a line that is too long
+            #   with no shrink also gets r = INF, but must never be accepted.
+            if -1 <= r <= tolerance or (forced_break and ideal_width < desired_line_length):
+                # Compute demerits and fitness class
+                # (powers are written out as multiplications since they are
+                #   much cheaper than going through `**`)
+                ar = -r if r < 0 else r
+                base = 1 + 100 * (ar * ar * ar) # 1 + the badness of the line
+                if B_penalty >= 0:
+                   t = base + B_penalty
+                   demerits = t * t * t
+                elif forced_break:
+                   demerits = base * base - B_penalty * B_penalty
+                else:
+                   demerits = base * base
+
+                # two consecutive breaks with flagged demerits causes an
+                # additional demerit to be added (don't want two lines with
+                # with a hyphen at the end of them)
+                if B_flagged and flagged[A_position]:
+                    demerits += flagged_demerit
+
+                # Figure out the fitness class of this line: 0 for a tight
+                #   line (r < -.5), 1 for a normal line (r <= .5), 2 for a
+                #   loose line (r <= 1), and 3 for a very loose line
+                fitness_class = (r >= -.5) + (r > .5) + (r > 1)
+
+                # If two consecutive lines are in very different fitness
+                # classes, add to the demerit score for this break.
+                if abs(fitness_class - fitness_classes[A]) > 1:
+                    demerits += fitness_demerit
+
+                # Record a feasible break from A to B (it is only
+                #   allocated once it is actually activated)
+                activate((i, A_line + 1, fitness_class, demerits, r, desired_line_length, A))
+
+            A = next_active[A]
+        # end while A != -1
+
+        # Deactivate nodes that need to be deactivated by unlinking them from
+        #   the active nodes. At least one active node is normally kept so
+        #   that the paragraph can still be finished, but a forced break that
+        #   some line can reach ends every line before it, so all of the
+        #   nodes before it are deactivated (the new nodes at B replace them)
+        keep_one = not (forced_break and len(breaks_to_activate) > 0)
+        for node in breaks_to_deactivate:
+            if keep_one and num_active_lines <= 1:
+                break
+
+            before = prev_active[node]
+            after  = next_active[node]
+
+            if before == -1: head = after
+            else:            next_active[before] = after
+
+            if after == -1: tail = before
+            else:           prev_active[after] = before
+
+            line = lines[node]
+            line_count[line] -= 1
+            if line_count[line] == 0:
+                line_first[line] = -1
+                num_active_lines -= 1
+            elif line_first[line] == node:
+                line_first[line] = after
+
+            active_nodes_set.remove((line, fitness_classes[node], positions[node]))
+        breaks_to_deactivate.clear()
+
+        # Activate the new nodes that need to be activated (only allocating
+        #   the ones that are not already accounted for)
+        for position, line, fitness_class, demerits, ratio, desired_line_length, previous in breaks_to_activate:
+            key = (line, fitness_class, position)
+            if key in active_nodes_set:
+                continue
+            active_nodes_set.add(key)
+
+            node = alloc(position, line, fitness_class, demerits, ratio, desired_line_length, previous)
+            next_active.append(-1)
+            prev_active.append(-1)
+
+            # Ties go to the node that comes first in the active nodes (the
+            #   lower line or, on the same line, the newer node)
+            if position == m - 1 and (best_end == -1 or demerits < demerits_of[best_end] or
+                    (demerits == demerits_of[best_end] and line <= lines[best_end])):
+                best_end = node
+
+            # The node goes in front of the first node of its line or, if its
+            #   line has no active nodes, in front of the first node of the
+            #   next line that does (or at the end of the list if no line
+            #   after it does)
+            if line == len(line_first):
+                # First node ever on this line
+                line_first.append(-1)
+                line_count.append(0)
+
+            if line_count[line] > 0:
+                after = line_first[line]
+            else:
+                after = -1
+                for later_line in range(line + 1, len(line_first)):
+                    if line_count[later_line] > 0:
+                        after = line_first[later_line]
+                        break
+                num_active_lines += 1
+            line_count[line] += 1
+            line_first[line] = node
+
+            if after == -1:
+                before = tail
+                tail = node
+            else:
+                before = prev_active[after]
+                prev_active[after] = node
+
+            if before == -1:
+                head = node
+            else:
+                next_active[before] = node
+
+            next_active[node] = after
+            prev_active[node] = before
+        breaks_to_activate.clear()
+    # end for i in feasible_breakpoints
+
+    # Only breaks at the very end of the paragraph can end it, so the active
+    #   node with the lowest number of demerits out of those was tracked as
+    #   they were activated
+    assert best_end != -1, \
+            'Could not find any set of beakpoints that both met the given criteria and ended at the end of the paragraph.'
+
+    A = best_end
+
+    if looseness != 0:
+        # For some reason, some of the active_nodes that reach this point do
+        #   not represent a break at the very end of the paragraph so only
+        #   consider ending breakpoints that actually include the ending line
+        #   of the paragraph
+        active_nodes = []
+        node = head
+        while node != -1:
+            if positions[node] == m - 1:
+                active_nodes.append(node)
+            node = next_active[node]
+
+        # The search for the appropriate active node is a bit more complicated;
+        # we look for a node with a paragraph length that's as close as
+        # possible to (A.line + looseness) with the minimum number of demerits.
+
+        # The best node found so far, starting with A itself, and how many
+        #   more lines than A it has
+        b = A
+        best = 0
+        d = demerits_of[A]
+        for br in active_nodes:
+            delta = lines[br] - lines[A]
+
+            # The two branches of this 'if' statement are for handling values
+            # of looseness that are either positive or negative.
+            if ((looseness <= delta < best) or (best < delta <= looseness)):
+                best = delta
+                d = demerits_of[br]
+                b = br
+
+            elif delta == best and demerits_of[br] < d:
+                # This break is of the same length, but has fewer demerits and
+                # hence is the one we should use.
+                d = demerits_of[br]
+                b = br
+
+        A = b
+
+    return brks, A
 
 # =============================================================================
 # KnuthPlassParagraph Class
@@ -190,6 +650,23 @@ class KnuthPlassParagraph:
         self.sum_width = None
         self.sum_shrink = None
         self.sum_stretch = None
+        self.next_box = None
+
+        # The text of each line asked for by line_text, keyed by the positions
+        #   of the breaks around it. Emptied every time
+        #   calc_knuth_plass_breaks is run.
+        self.line_texts = {}
+
+    def __getstate__(self):
+        """
+        Only pickles the specs and vals (such as when batch_calc sends the
+            paragraph to a worker process); everything derived from them is
+            recomputed by calc_knuth_plass_breaks.
+        """
+        state = self.__dict__.copy()
+        state.update(sum_width=None, sum_shrink=None, sum_stretch=None,
+                next_box=None, line_texts={})
+        return state
 
     # -------------------------------------------------------------------------
     # Methods used in manipulating the paragraph before you calculate the knuth_plass_breaks
@@ -207,6 +684,16 @@ class KnuthPlassParagraph:
         self.specs.append(spec)
         self.vals.append(value)
 
+    def extend(self, specs:List[Spec], values:List[Any]):
+        """
+        Appends each Spec in `specs` to the paragraph along with the value at
+            the same index in `values`.
+        """
+        assert len(specs) == len(values), \
+                'Every Spec must be given exactly one value.'
+        self.specs.extend(specs)
+        self.vals.extend(values)
+
     def append_std_end(self):
         """
         Appends the standard end to any paragraph.
@@ -235,6 +722,33 @@ class KnuthPlassParagraph:
         else:
             return 0
 
+    def to_arrays(self):
+        """
+        Returns the widths, stretches, shrinks, penalties, flagged values,
+            forced values (see Penalty.forced), and types of the Specs of this
+            paragraph as parallel flat lists (one entry per position in the
+            paragraph).
+        """
+        specs = self.specs
+        return ([spec.width   for spec in specs],
+                [spec.stretch for spec in specs],
+                [spec.shrink  for spec in specs],
+                [spec.penalty for spec in specs],
+                [spec.flagged for spec in specs],
+                [spec.forced  for spec in specs],
+                [spec.t       for spec in specs])
+
+    def _find_next_box(self, types:List[int]):
+        """
+        Computes next_box, where next_box[i] is the position of the first Box
+            at or after position i (or the length of the paragraph if there
+            is none), so that line_contents can find where a line starts
+            without scanning for it.
+        """
+        m = len(types)
+        box_or_end = [i if t == BOX else m for i, t in enumerate(types)]
+        self.next_box = list(accumulate(reversed(box_or_end), min))[::-1]
+
     #@profile()
     def calc_knuth_plass_breaks(self,
             line_lengths:Union[List[Num], Num, \
@@ -260,249 +774,40 @@ class KnuthPlassParagraph:
         flagged_demerit : additional value added to the demerit score when breaking
             at the second of two flagged penalties.
         """
-        paragraph = self.specs # Only the specs are needed for the actual algorithm
-
-        if isinstance(line_lengths, int) or isinstance(line_lengths, float):
-            line_lengths = [line_lengths]
-
-        m = len(paragraph)
-        if m == 0: return [] # No text, so no breaks
-
-        # Precompute the running sums of width, stretch, and shrink (W,Y,Z in the
-        # original paper).  These make it easy to measure the width/stretch/shrink
-        # between two indexes; just compute sum_*[pos2] - sum_*[pos1].  Note that
-        # sum_*[i] is the total up to but not including the box at position i.
-        sum_width = [0] * m; sum_stretch = [0] * m; sum_shrink  = [0] * m
-        width_sum = stretch_sum = shrink_sum = 0.0
-        for i, spec in enumerate(paragraph):
-            sum_width[i] = width_sum
-            sum_stretch[i] = stretch_sum
-            sum_shrink[i] = shrink_sum
-
-            width_sum += spec.width
-            stretch_sum += spec.stretch
-            shrink_sum  += spec.shrink
-
-        def compute_adjustment_ratio(pos1, pos2, line, line_lengths):
-            """
-            Compute adjustment ratio for the line between pos1 and pos2.
-
-            This is how much you would have to shrink (if r < 0) or
-                stretch (if r > 0) the line we are currently looking at in order to
-                make it exactly fit exactly the current line (make it have the same
-                exact same length as the current line).
-            """
-            ideal_width =  sum_width[pos2] - sum_width[pos1] # ideal width
-
-            if paragraph[pos2].t == PENALTY:
-                ideal_width += paragraph[pos2].width
-
-            # Get the length of the current line; if the line_lengths list
-            # is too short, the last value is always used for subsequent
-            # lines.
-            if line < len(line_lengths):
-                available_width = line_lengths[line]
-            else:
-                available_width = line_lengths[-1]
-
-            # Compute how much the contents of the line would have to be
-            # stretched or shrunk to fit into the available space.
-            if ideal_width < available_width:
-                # You would have to stretch this line if you want it to fit on the
-                #   desired line
-                y = sum_stretch[pos2] - sum_stretch[pos1] # The total amount of stretch (in whatever units all the parts of the paragraph are measured in) you can stretch this line by
-
-                if y > 0:
-                    # Since it is possible to stretch the line, found out how much
-                    #   you should stretch it by to take up the full width of the line
-                    r = (available_width - ideal_width) / float(y)
-                else:
-                    r = INF
-
-            elif ideal_width > available_width:
-                # Must shrink the line by removing space from glue if you want it
-                #   to fit on the line
-                z = sum_shrink[pos2] - sum_shrink[pos1] # Total amount you could possibly shrink this line by to make it fit on the current desired line
-
-                if z > 0:
-                    # Since it is possible to shrink the line, find how much you
-                    #   should shrink it to fit it perfectly (width matches desired
-                    #   width) on the line
-                    r = (available_width - ideal_width) / float(z)
-                else:
-                    r = INF
-            else:
-                # Exactly the right length!
-                r = 0
-
-            return r, available_width
-
-        A = Break(position=0, line=0, fitness_class=1, demerits=0, ratio=1, desired_line_length=None)
-
-        # Keep breaks sorted by their line numbers (the actual sorting happens
-        #   in active_nodes_gen when the line numbers are sorted and used to
-        #   access the dict)
-        active_nodes = {A.line: [A]}
-
-        # Used to easily see if a node is already accounted for so that we do
-        #   not look at the same Break twice
-        active_nodes_set = {A.key()}
-
-        def add_active_node(node):
-            """
-            Adds an active node to the active nodes.
-            """
-            if node.key() in active_nodes_set:
-                return
-
-            node_line = node.line
-
-            if node_line in active_nodes:
-                active_nodes[node_line].insert(0, node)
-            else:
-                active_nodes[node_line] = [node]
-
-            active_nodes_set.add(node.key())
-
-        def remove_active_node(node):
-            """
-            Removes an active node from the active nodes.
-            """
-            nodes = active_nodes[node.line]
-            nodes.remove(node)
-
-            if len(nodes) == 0:
-                active_nodes.pop(node.line)
-
-            active_nodes_set.remove(node.key())
-
-        def active_nodes_gen():
-            """
-            Yields the active nodes in the order they would be if they were in
-                a normal list.
-            """
-            for line_num in sorted(active_nodes.keys()):
-                for node in active_nodes[line_num]:
-                    yield node
-        # -- End Function
-
-        breaks_to_deactivate = [] # List of breaks that were feasible but no longer are
-        breaks_to_activate   = [] # List of newly-found feasible breaks
-        for i, B in enumerate(paragraph):
-            # Determine if this box is a feasible breakpoint and
-            # perform the main loop if it is.
-            if self.is_feasible_breakpoint(i):
-                # Loop over the list of active nodes, and compute the fitness
-                # of the line formed by breaking at A and B
-                for A in active_nodes_gen():
-                    r, desired_line_length = compute_adjustment_ratio(A.position, i, A.line, line_lengths)
-
-                    if (r < -1 or B.penalty >= INF):
-                        # Deactivate node A
-                        breaks_to_deactivate.append(A)
-
-                    if -1 <= r <= tolerance:
-                        # Compute demerits and fitness class
-                        if B.penalty >= 0:
-                           demerits = (1 + 100 * abs(r)**3 + B.penalty) ** 3
-                        elif B.penalty <= -INF: # Forced break point
-                           demerits = (1 + 100 * abs(r)**3) ** 2 - B.penalty**2
-                        else:
-                           demerits = (1 + 100 * abs(r)**3) ** 2
-
-                        # two consecutive breaks with flagged demerits causes an
-                        # additional demerit to be added (don't want two lines with
-                        # with a hyphen at the end of them)
-                        if B.flagged and paragraph[A.position].flagged:
-                            demerits += flagged_demerit
-
-                        # Figure out the fitness class of this line
-                        if   r < -.5: fitness_class = 0 # tight line
-                        elif r <= .5: fitness_class = 1 # normal line
-                        elif r <= 1:  fitness_class = 2 # loose line
-                        else:         fitness_class = 3 # very loose line
-
-                        # If two consecutive lines are in very different fitness
-                        # classes, add to the demerit score for this break.
-                        if abs(fitness_class - A.fitness_class) > 1:
-                            demerits += fitness_demerit
-
-                        # Record a feasible break from A to B
-                        brk = Break(
-                                position      = i,
-                                line          = A.line + 1,
-                                fitness_class = fitness_class,
-                                demerits      = demerits,
-                                ratio         = r,
-                                desired_line_length = desired_line_length,
-                                previous      = A
-                            )
-                        breaks_to_activate.append(brk)
-                # end for A in active_nodes
-
-                # Deactivate nodes that need to be deactivated
-                for node in breaks_to_deactivate:
-                    if len(active_nodes) > 1:
-                        remove_active_node(node)
-                    else:
-                        break
-                breaks_to_deactivate.clear()
-
-                # Activate the new nodes that need to be activated
-                for node in breaks_to_activate:
-                    add_active_node(node)
-                breaks_to_activate.clear()
-
-            # end if self.feasible_breakpoint()
-        # end for i in range(m)
-
-        active_nodes = [node for node in active_nodes_gen()]
-
-        # For some reason, some of the active_nodes that reach this point do not
-        #   represent a break at the very end of the paragraph so only consider
-        #   ending breakpoints that actually include the ending line of the
-        #   paragraph
-        for node in active_nodes[:]:
-            if node.position != len(paragraph) - 1:
-                active_nodes.remove(node)
-
-        assert len(active_nodes) > 0, \
-                'Could not find any set of beakpoints that both met the given criteria and ended at the end of the paragraph.'
-
-        # Find the active node with the lowest number of demerits.
-        A = min(active_nodes, key=lambda A: A.demerits)
-
-        if looseness != 0:
-            # The search for the appropriate active node is a bit more complicated;
-            # we look for a node with a paragraph length that's as close as
-            # possible to (A.line + looseness) with the minimum number of demerits.
-
-            best = 0
-            d = INF
-            for br in active_nodes:
-                delta = br.line - A.line
-
-                # The two branches of this 'if' statement are for handling values
-                # of looseness that are either positive or negative.
-                if ((looseness <= delta < best) or (best < delta < looseness)):
-                    s = delta
-                    d = br.demerits
-                    b = br
-
-                elif delta == best and br.demerits < d:
-                    # This break is of the same length, but has fewer demerits and
-                    # hence is the one we should use.
-                    d = br.demerits
-                    b = br
-
-            A = b
-
-        # -- Generate the list of chosen break points
-        breaks = []
-        while A is not None:
-            breaks.append(A)
-            A = A.previous
-        breaks.reverse()
+        # Normalize the line lengths to a tuple once (this also lets them be
+        #   given by a generator)
+        if isinstance(line_lengths, Real):
+            line_lengths = (line_lengths,)
+        else:
+            line_lengths = tuple(line_lengths)
+
+        if len(self.specs) == 0: return [] # No text, so no breaks
+
+        # -- Flatten the Specs into arrays for the kernel and compute the
+        #   running sums of width, stretch, and shrink (W,Y,Z in the original
+        #   paper). The sums make it easy to measure the width/stretch/shrink
+        #   between two indexes; just compute sum_*[pos2] - sum_*[pos1]. Note
+        #   that sum_*[i] is the total up to but not including the Spec at
+        #   position i (so each has one more item than the paragraph, the
+        #   total of the whole paragraph).
+        widths, stretches, shrinks, penalties, flagged, forced, types = self.to_arrays()
+        self.sum_width   = sum_width   = list(accumulate(widths,    initial=0.0))
+        self.sum_stretch = sum_stretch = list(accumulate(stretches, initial=0.0))
+        self.sum_shrink  = sum_shrink  = list(accumulate(shrinks,   initial=0.0))
+
+        self._find_next_box(types)
+
+        # The line texts of any earlier breaks might not match these ones
+        self.line_texts = {}
+
+        brks, A = knuth_plass_kernel(sum_width, sum_stretch,
+                sum_shrink, widths, penalties, flagged, forced, types,
+                line_lengths, looseness, tolerance, fitness_demerit,
+                flagged_demerit)
+
+        # -- Generate the list of chosen break points (only the chosen breaks
+        #   are ever turned into Break objects)
+        breaks = brks.chain(A)
         breaks.pop(0) # Ignore first break because it is break that started this paragraph, not first break in paragaph
 
         # -- Return the results
@@ -513,33 +818,129 @@ class KnuthPlassParagraph:
 
     def line_contents(self, brk:Break):
         """
-        Yields the spec and val for each position specified by the given line
-            break line specified by the given break.
+        Returns an iterator over the spec and val for each position specified
+            by the given line break line specified by the given break.
         """
+        if self.next_box is None:
+            # The breaks were not made by calc_knuth_plass_breaks
+            self._find_next_box([spec.t for spec in self.specs])
+
+        specs = self.specs
+
         # Only include brk.position (the last item in the line) in the line if
         # it is a penalty item--because in that case it is probably specifying
         # a hyphen; otherwise it would be a Glue at the end the line (otherwise
         # end of the line broke at a space)
-        end = brk.position + 1 if self.specs[brk.position].t == PENALTY else brk.position
+        end = brk.position + 1 if specs[brk.position].t == PENALTY else brk.position
+
+        # Can't start a line with penalty or glue, so start at the first Box
+        #   (but never past the end of the line, since a line can have no
+        #   Boxes at all, such as the last line after a break at trailing
+        #   whitespace or a line ending at a forced break right after a space)
+        start = min(self.next_box[brk.previous.position], end)
 
-        start = brk.previous.position
+        return zip(specs[start:end], self.vals[start:end])
 
-        # Can't start a line with penalty or glue
-        while self.specs[start].t in (PENALTY, GLUE) and start < end:
-            start += 1
+    def line_text(self, brk:Break, glue_width:int=1):
+        """
+        Returns the text of the line that ends at the given break with every
+            glue on it being exactly `glue_width` spaces wide.
+
+        The text is cached so that asking for the same line again (such as
+            when formatting the same breaks with several justifications) does
+            not rebuild it. The cache is emptied by calc_knuth_plass_breaks,
+            so run it again after changing the paragraph.
+        """
+        key = (brk.previous.position, brk.position, glue_width)
+        text = self.line_texts.get(key)
+        if text is not None:
+            return text
+
+        glue = ' ' * glue_width
+        parts = []
+        append = parts.append
+        for spec, val in self.line_contents(brk):
+            t = spec.t
+            if t == GLUE:
+                append(glue)
+            elif t == BOX:
+                append(val) # This assumes that the value is a string character
+        text = ''.join(parts)
+
+        self.line_texts[key] = text
+        return text
 
-        for i in range(start, end):
-            yield self.specs[i], self.vals[i]
+# =============================================================================
+# Calculating the Breaks of Many Paragraphs
+# -----------------------------------------------------------------------------
+
+def _compute_breaks_worker(par, args, kwargs):
+    """
+    Calculates the breaks of one paragraph in a worker process for batch_calc.
+
+    The breaks are sent back as flat tuples of their fields (starting with the
+        break that starts the paragraph) rather than as Breaks because a chain
+        of Breaks linked by `previous` is too deeply nested to be pickled for
+        paragraphs with many lines.
+    """
+    breaks = par.calc_knuth_plass_breaks(*args, **kwargs)
+    if len(breaks) == 0:
+        return []
+    return [brk[:-1] for brk in [breaks[0].previous] + breaks]
+
+def _relink_breaks(rows):
+    """
+    Turns what _compute_breaks_worker returns back into linked Breaks.
+    """
+    breaks = []
+    previous = None
+    for fields in rows:
+        previous = Break(*fields, previous)
+        breaks.append(previous)
+    return breaks[1:] # Ignore the break that started the paragraph
+
+def batch_calc(pars:List[KnuthPlassParagraph], *args, workers:Optional[int]=None, **kwargs):
+    """
+    Calculates the breaks of every given paragraph in parallel (each paragraph
+        is completely independent of the others) and returns a list of the
+        breaks of each paragraph in the same order as the paragraphs.
+
+    Any other arguments are passed on to calc_knuth_plass_breaks for every
+        paragraph. `workers` is the maximum number of processes to use (the
+        number of CPUs if it is None).
+    """
+    with ProcessPoolExecutor(workers) as ex:
+        return [_relink_breaks(rows) for rows in ex.map(_compute_breaks_worker, pars, repeat(args), repeat(kwargs))]
 
 # =============================================================================
 # Methods showing of how to use the KnuthPlassParagraph
 # -----------------------------------------------------------------------------
 
+# Maps the latin-1 encoding of each character to the class of Spec that
+#   make_paragraph uses for it: 0 for a Box (a character), 1 for a Glue (a
+#   space or newline), 2 for a forced break ('@'), and 3 for an unallowed
+#   break ('~')
+_CLASS_TABLE = bytearray(256)
+_CLASS_TABLE[ord(' ')]  = 1
+_CLASS_TABLE[ord('\n')] = 1
+_CLASS_TABLE[ord('@')]  = 2
+_CLASS_TABLE[ord('~')]  = 3
+_CLASS_TABLE = bytes(_CLASS_TABLE)
+
+# Maps the latin-1 encoding of each character to 1 if it is whitespace and 0
+#   if it is not, so that a whole string can be classified at once
+_WS_BYTES = bytes(1 if chr(i) in WHITESPACE else 0 for i in range(256))
+
 def make_paragraph(text):
     """
     An example function that takes in text and returns a paragraph from it that
-        can be used in the Knuth-Plass Algorithm.
+        can be used in the Knuth-Plass Algorithm. The text can be a str or
+        any iterable of characters.
     """
+    # The characters are classified with str methods, so make sure it is one
+    if not isinstance(text, str):
+        text = ''.join(text)
+
     # Create the paragraph that we will be using to describe the text as a paragraph
     par = KnuthPlassParagraph()
 
@@ -558,21 +959,30 @@ def make_paragraph(text):
     # to be different for each one
     char_box = Box(1)
 
-    for ch in text:
-        if ch in ' \n':
-            # Add the space between words
-            par.append(space_glue, ' ')
-        elif ch == '@':
-            # Append forced break
-            par.append(forced_break_penalty, '')
-
-        elif ch == '~':
-            # Append unallowed break
-            par.append(unallowed_break, '')
-
-        else:
-            # All characters are 1 unit wide
-            par.append(char_box, ch)
+    # The Spec to use for each class of character given by _CLASS_TABLE
+    shared_specs = (char_box, space_glue, forced_break_penalty, unallowed_break)
+
+    # Classify every character at once. ASCII text can be encoded as is
+    #   (which is nearly free) while other text has the characters that are
+    #   not latin-1 replaced by '?', which is classified as a Box like they
+    #   should be.
+    if text.isascii():
+        data = text.encode('ascii')
+    else:
+        data = text.encode('latin-1', 'replace')
+    codes = data.translate(_CLASS_TABLE)
+
+    # Build the specs and values for the whole text before handing them to
+    #   the paragraph in one go. Boxes and spaces use the character itself as
+    #   their value, so only the characters that do not are replaced.
+    specs = list(map(shared_specs.__getitem__, codes))
+    vals  = list(text)
+    for ch, val in (('\n', ' '), ('@', ''), ('~', '')):
+        i = text.find(ch)
+        while i != -1:
+            vals[i] = val
+            i = text.find(ch, i + 1)
+    par.extend(specs, vals)
 
     # Append standard way to end the paragraph
     par.append_std_end()
@@ -581,113 +991,166 @@ def make_paragraph(text):
 
 def insert_spaces(string, num_spaces):
     """
-    Inserts the given number of spaces into the given string, trying to put
-        them inbetween words from the left side to the right.
+    Inserts the given number of spaces into the given string, spreading them
+        as evenly as possible between its words from the left side to the
+        right.
     """
-    from random import randint
-    while True:
-
-        out = ''
-        added_space = False
-        add_space = False # used to make sure that we only add whitespace to where there was already whitespace
-        for ch in string:
-            if num_spaces > 0 and add_space == True and ch in WHITESPACE:
-                if randint(0, 1): # 50% chance to add space here
-                    out += ' '
-                    num_spaces -= 1
-                added_space = True
-                add_space = False
-            else:
-                add_space = True
-
-            out += ch
-
-        # If had no opportunity to add a space, then probably last line of
-        # Justified paragraph so its left justified anyway. Just add a
-        # space to the end.
-        if not added_space and num_spaces > 0:
-            out += ' '
-            num_spaces -= 1
-
-        if num_spaces <= 0:
-            break
-
-        string = out
-
-    return out
-
-
-def str_for_breaks(par, breaks, justify:str=JUSTIFY.LEFT, end_mark:str=''):
+    if num_spaces <= 0:
+        return string
+
+    # The indexes of whitespace that directly follows a word (the places that
+    #   spaces can be added), found by searching the string's whitespace mask
+    #   for a non-whitespace character followed by a whitespace one
+    mask = string.encode('latin-1', 'replace').translate(_WS_BYTES)
+    find = mask.find
+    positions = []
+    i = find(b'\x00\x01')
+    while i != -1:
+        positions.append(i + 1)
+        i = find(b'\x00\x01', i + 2)
+    num_positions = len(positions)
+
+    # If had no opportunity to add a space, then probably last line of
+    # Justified paragraph so its left justified anyway. Just add the spaces
+    # to the end.
+    if num_positions == 0:
+        return string + (' ' * num_spaces)
+
+    # How many spaces to add at each position
+    if num_spaces >= num_positions:
+        # Every position gets the same number of spaces and the leftover
+        #   spaces go to the leftmost positions
+        per_position, leftover = divmod(num_spaces, num_positions)
+        counts = [per_position + 1] * leftover + [per_position] * (num_positions - leftover)
+    else:
+        # Not every position gets a space so spread them out evenly
+        counts = [0] * num_positions
+        for k in range(num_spaces):
+            counts[(k * num_positions) // num_spaces] = 1
+
+    # Rebuild the string with the spaces added in one pass
+    parts = []
+    append = parts.append
+    start = 0
+    for i, count in zip(positions, counts):
+        append(string[start:i])
+        append(' ' * count)
+        start = i
+    append(string[start:])
+    return ''.join(parts)
+
+
+def _str_line_full(par, brk):
     """
-    Takes what is returned by the knuth_plass_breaks() function and turns it
-        into a string depending on the given justification.
+    Returns the text of the line that ends at the given break with every glue
+        on it stretched/shrunk by the break's ratio so that the text is fully
+        justified.
     """
-    justify = justify.upper() # Justify constants are all upper-case, so make sure this matches as long as same word used
-
-    total_num_lines = len(breaks)
-
-    out = ''
-    curr_line = ''
+    ratio = brk.ratio
+    parts = []
+    append = parts.append
+    for spec, val in par.line_contents(brk):
+        t = spec.t
+        if t == GLUE:
+            append(' ' * int(spec.r_width(ratio)))
+        elif t == BOX:
+            append(val) # This assumes that the value is a string character
+    return ''.join(parts)
+
+def _str_left(par, breaks, end_mark):
+    out_parts = []
+    append = out_parts.append
     for brk in breaks:
-        line_num    = brk.line
-        ratio       = brk.ratio
-        line_length = brk.desired_line_length
-
-        # -- Build the current line
-        for spec, val in par.line_contents(brk):
-            if spec.is_glue():
-                if justify == JUSTIFY.FULL and (not (line_num == total_num_lines)):
-                    # Need to add space inbetween words to fully justify text
-                    #   on the left and right
-                    width = int(spec.r_width(ratio))
-                else:
-                    # Not Full justified, so no extra spaces between the words.
-                    width = 1
-
-                curr_line += ' ' * width
-
-            elif spec.is_box():
-                curr_line += val # This assumes that the value is a string character
-
-        # -- Justify The Built Line
-
-        if (justify == JUSTIFY.LEFT) or (justify == JUSTIFY.FULL and line_num == total_num_lines):
-            curr_line = curr_line.lstrip(WHITESPACE_CHARS)
-            out += curr_line + (' ' * (line_length - len(curr_line)))
+        curr_line = par.line_text(brk).lstrip(WHITESPACE_CHARS)
+        append(curr_line)
+        append(' ' * (brk.desired_line_length - len(curr_line)))
+        append(end_mark)
+        append("\n")
+    return ''.join(out_parts)
+
+def _str_right(par, breaks, end_mark):
+    out_parts = []
+    append = out_parts.append
+    for brk in breaks:
+        curr_line = par.line_text(brk).rstrip(WHITESPACE_CHARS)
+        append(' ' * (brk.desired_line_length - len(curr_line)))
+        append(curr_line)
+        append(end_mark)
+        append("\n")
+    return ''.join(out_parts)
+
+def _str_center(par, breaks, end_mark):
+    out_parts = []
+    append = out_parts.append
+    for brk in breaks:
+        curr_line = par.line_text(brk).strip(WHITESPACE_CHARS)
 
-        elif justify == JUSTIFY.RIGHT:
-            curr_line = curr_line.rstrip(WHITESPACE_CHARS)
-            out += (' ' * (line_length - len(curr_line))) + curr_line
+        total_spaces_needed = brk.desired_line_length - len(curr_line)
 
-        elif justify == JUSTIFY.CENTER:
-            curr_line = curr_line.strip(WHITESPACE_CHARS)
+        # NOTE: this will skew the text of this line left by 1 space if
+        # this line's text is not perfectly centerable. If had floating
+        # point width spaces, then would be perfectly centered always, but
+        # can't because using str's instead
+        right_spaces  = total_spaces_needed // 2
+        left_spaces = total_spaces_needed - right_spaces
 
-            total_spaces_needed = line_length - len(curr_line)
+        append(' ' * left_spaces)
+        append(curr_line)
+        append(' ' * right_spaces)
+        append(end_mark)
+        append("\n")
+    return ''.join(out_parts)
 
-            # NOTE: this will skew the text of this line left by 1 space if
-            # this line's text is not perfectly centerable. If had floating
-            # point width spaces, then would be perfectly centered always, but
-            # can't because using str's instead
-            right_spaces  = total_spaces_needed // 2
-            left_spaces = total_spaces_needed - right_spaces
+def _str_full(par, breaks, end_mark):
+    total_num_lines = len(breaks)
 
-            out += (' ' * left_spaces) + curr_line + (' ' * right_spaces)
+    out_parts = []
+    append = out_parts.append
+    for brk in breaks:
+        line_length = brk.desired_line_length
 
-        elif justify == JUSTIFY.FULL:
+        if brk.line == total_num_lines:
+            # The last line of a fully justified paragraph is left justified
+            curr_line = par.line_text(brk).lstrip(WHITESPACE_CHARS)
+            append(curr_line)
+            append(' ' * (line_length - len(curr_line)))
+        else:
             # NOTE: Because the algorithm assumes that glues can have decimal
             # widths but strings need ints, we have cut off some space when we
             # converted them to integer widths. That is why we have to use
             # `insert_spaces` here: some space was probably cut off so we need
             # to add some back.
-            curr_line = curr_line.strip() # May have whitespace on ends because of glues
-            curr_line = insert_spaces(curr_line, line_length - len(curr_line))
-            out += curr_line
-        else:
-            raise Exception(f"Gave unknown justification specification: {justify}")
+            curr_line = _str_line_full(par, brk).strip() # May have whitespace on ends because of glues
+            append(insert_spaces(curr_line, line_length - len(curr_line)))
+
+        append(end_mark)
+        append("\n")
+    return ''.join(out_parts)
+
+# The function that builds the string for each kind of justification
+_JUSTIFY_FN = {
+    JUSTIFY.LEFT:   _str_left,
+    JUSTIFY.RIGHT:  _str_right,
+    JUSTIFY.CENTER: _str_center,
+    JUSTIFY.FULL:   _str_full,
+}
+
+def str_for_breaks(par, breaks, justify:Union[JUSTIFY, str]=JUSTIFY.LEFT, end_mark:str=''):
+    """
+    Takes what is returned by the knuth_plass_breaks() function and turns it
+        into a string depending on the given justification (either a JUSTIFY
+        constant or its name).
+    """
+    if isinstance(justify, str):
+        # Justify names are all upper-case, so make sure this matches as long as same word used
+        justify = _JUSTIFY_LOOKUP.get(justify.upper(), justify)
+
+    if justify not in _JUSTIFY_FN:
+        raise Exception(f"Gave unknown justification specification: {justify}")
 
-        curr_line = ''
-        out += end_mark + "\n"
-    return out
+    # The justification is the same for every line, so pick the function
+    #   specialized for it once instead of checking it on every line
+    return _JUSTIFY_FN[justify](par, breaks, end_mark)
 
 # =============================================================================
 # Main
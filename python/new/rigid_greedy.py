@@ -3,15 +3,12 @@ Implements the code for a rigid greedy line-break algorithm i.e. an algorithm
     for text where it is assumed every character (including spaces) is exactly
     1 character long.
 """
-from io import StringIO
 import random
-from typing import Callable, Final, List, Literal, Tuple, Union
-import math
+from itertools import accumulate
+from typing import Callable, Final, List, Literal, Optional, Tuple, Union
 
 def text_len(text:List[str]) -> int:
-    cnt = 0
-    for t in text: cnt += len(t)
-    return cnt
+    return sum(map(len, text))
 
 def never_break_word(word:str) -> List[str]:
     """
@@ -22,13 +19,132 @@ def never_break_word(word:str) -> List[str]:
     return [word]
 
 
+def _next_syl(syls:List[str], width:int, hyphen_char:str, hyphen_char_len:int) -> Optional[Tuple[str, List[str]]]:
+    """
+    Turns the given list of syllables into a tuple containing
+        the first number of syllables it could fit in the given
+        width and then the list of strings that is everything leftover
+        after the syllables.
+
+    Returns None if the first syllable alone on a line cannot fit in the
+        given width.
+    """
+    total = 0 # length of the syllables taken so far
+    last_i = len(syls) - 1
+    for i, syl in enumerate(syls):
+        syl_len = len(syl)
+        hyphen = 0 if i == last_i else hyphen_char_len # no hyphen on last syllable
+
+        if total > 0 and total + syl_len + hyphen > width:
+            # There was already a syllable and the current one cannot be
+            # added to it, so return the syllables so far plus the remaining
+            # syllables
+            return ''.join(syls[:i]) + hyphen_char, syls[i:]
+        elif syl_len + hyphen > width:
+            # Even just this syllable, on it's own, cannot fit in the given
+            # width
+            return None
+
+        total += syl_len
+
+    return ''.join(syls), []
+
+def _add_syllables(
+        syls:List[str],
+        curr_line:List[str],
+        curr_line_len:int,
+        line_num:int,
+        width:Callable[[int], int],
+        hyphen_char:str,
+        hyphen_char_len:int,
+    ) -> Optional[Tuple[str, List[List[str]]]]:
+    """
+    Works out how to add the given syllables of a word to a paragraph whose
+        current line (line number `line_num`) is `curr_line`. Returns the last
+        syllable placed and the lines that the syllables make. If no lines are
+        returned, then all the syllables fit at the end of the current line as
+        the returned syllable. Otherwise, the current line is done and the
+        lines (the last of which is the new current line) replace it.
+
+    Returns None if it was unable to add them.
+    """
+    next_lines:List[List[str]] = []
+
+    if len(curr_line) > 0:
+        # There are words already on the current line so try to add to that
+        # line
+        space_left = width(line_num) - (curr_line_len + 1)
+
+        res = _next_syl(syls, space_left, hyphen_char, hyphen_char_len)
+
+        if res is None:
+            # The syllables are unchanged so add content of current line then
+            # continue onward to handle the syllables on a new, empty line
+            next_lines.append(curr_line)
+        else:
+            syl, syls = res
+
+            if len(syls) == 0:
+                # All syllables were used and can be put on current line
+                return syl, next_lines
+            else:
+                # More syllables to add after this one was added to the line
+                next_lines.append([*curr_line, syl])
+
+    # Now, add rest of syllables to new lines
+    while True:
+
+        res = _next_syl(syls, width(line_num + len(next_lines)), hyphen_char, hyphen_char_len)
+
+        if res is None:
+            # Could not fit a syllable on the line
+            return None
+
+        syl, syls = res
+
+        next_lines.append([syl])
+
+        if len(syls) == 0:
+            break
+
+    return syl, next_lines
+
+
+def _pack_lengths(lengths:List[int], width:Callable[[int], int]) -> Optional[List[int]]:
+    """
+    Greedily packs words of the given lengths into lines, with 1 space between
+        each word on a line, and returns the index of the first word of each
+        line. This only ever looks at the lengths of the words so it is only
+        valid when words are never broken up.
+
+    Returns None if a word is too long to fit on a line by itself, in which
+        case the word has to be broken up after all.
+    """
+    starts:List[int] = []
+    curr_len = 0
+    line_width = 0
+    for i, word_len in enumerate(lengths):
+        if len(starts) > 0 and curr_len + 1 + word_len <= line_width:
+            curr_len += 1 + word_len
+            continue
+
+        # Start a new line with the word on it
+        line_width = width(len(starts))
+        if word_len > line_width:
+            return None
+        starts.append(i)
+        curr_len = word_len
+
+    return starts
+
 def rigid_greedy_break(
         text:Union[str, List[str]],
         line_widths:Callable[[int], int]=lambda _: 100,
         end_line_break_word:Callable[[str], List[str]]=never_break_word,
         empty_line_break_word:Callable[[str], List[str]]=never_break_word,
         hyphen_char:str='-',
-    ) -> List[List[str]]:
+        return_lens:bool=False,
+    ) -> Union[List[List[str]], Tuple[List[List[str]], List[int]]]:
     """
     Breaks lines greadily, assuming that all characters (including spaces) are
         exactly 1 unit long (that's why it is rigid). The broken up paragraph
@@ -70,10 +186,16 @@ def rigid_greedy_break(
 
     hyphen_char: The character(s) to use as hyphens (if want no hyphens, use '',
         if want more than 1 char per hyphen, can use longer string).
+
+    return_lens: If True, a tuple of the lines and a list of how many characters
+        (not counting spaces) are on each line is returned instead of just the
+        lines. The lengths can be given to rigid_full_justify so that it does
+        not have to count them again.
     """
     space:Final[Literal[1]] = 1 # constant used instead of magic number
 
     words:List[str] = text.split() if isinstance(text, str) else text
+    word_lens:List[int] = list(map(len, words))
 
     lines:List[List[str]] = [] # each inner list is one line of words, each seperated by spaces
     curr_line:List[str] = []
@@ -81,216 +203,128 @@ def rigid_greedy_break(
 
     hyphen_char_len = len(hyphen_char)
 
-    def width(i:Union[int, None]=None) -> int:
+    def width(i:int) -> int:
         """
         Gets the width for the given line number.
         """
-        w:int = line_widths(len(lines) if i is None else i)
+        w:int = line_widths(i)
         return w if w > 0 else 0
 
-    def new_line():
-        nonlocal lines
-        nonlocal curr_line
-        nonlocal curr_line_len
+    break_at_end = end_line_break_word is not never_break_word
+    break_when_empty = empty_line_break_word is not never_break_word
 
-        lines.append(curr_line)
-        curr_line = []
-        curr_line_len = 0
-
-    def next_syl(syls:List[str], width:int) -> Tuple[str, List[str]]:
-        """
-        Turns the given list of syllables into a tuple containing
-            the first number of syllables it could fit in the given
-            width and then the list of strings that is everything leftover
-            after the syllables.
-        
-        Raises AssertionError if any syllable alone on a line cannot fit in the
-            given width.
-        """
-        nonlocal hyphen_char_len
-        nonlocal hyphen_char
+    if not (break_at_end or break_when_empty):
+        # No word is ever broken up unless it is too long for a line on its
+        # own, so only the lengths of the words matter
+        starts = _pack_lengths(word_lens, width)
+        if starts is not None:
+            ends = starts[1:]
+            ends.append(len(words))
+            lines = [words[start:end] for start, end in zip(starts, ends)]
 
-        out = ''
-        for i, syl in enumerate(syls):
-            last = (i == (len(syls) - 1)) # if last syllable
-
-            hyphen = 0 if last else hyphen_char_len # no hyphen on last syllable
-
-            if len(syl) + hyphen > width:
-                # Cannot fit the current syllable in the given width
-
-                if len(out) > 0:
-                    # There was already a syllable so just return it and all extra text
-                    return out + hyphen_char, syls[i:]
-                else:
-                    # Even just this syllable, on it's own, cannot fit in the given
-                    # width
-                    raise AssertionError()
-            elif len(out) > 0:
-                # There is a previous syllable that we are adding to
-
-                if len(out) + len(syl) + hyphen > width:
-                    # The current syllable cannot be added to the last one, so
-                    # return the syllable plus the remaining syllables
-                    return out + hyphen_char, syls[i:]
-                else:
-                    out += syl
-            else:
-                # The current syllable fits on the line
-                out += syl
-        
-        return out, []
-
-    def add_syllables(word:str, break_word:Callable[[str], List[str]]):
-        """
-        Adds the syllables of the given word to the paragraph or raises
-            an AssertionError if it was unable to.
-        """
-        nonlocal lines
-        nonlocal curr_line
-        nonlocal curr_line_len
+            if return_lens:
+                sums = list(accumulate(word_lens, initial=0))
+                return lines, [sums[end] - sums[start] for start, end in zip(starts, ends)]
+            return lines
 
-        next_lines:List[List[str]] = []
-        syls_remaining = break_word(word)
+    for word, word_len in zip(words, word_lens):
 
         if len(curr_line) > 0:
-            # There are words already on the current line so try to add to that
-            # line
-            space_left = width(len(lines) + len(next_lines)) - (curr_line_len + space)
-
-            try:
-                syl, syls_remaining = next_syl(syls_remaining, space_left)
-
-                if len(syls_remaining) == 0:
-                    # All syllables were used and can be put on current line so
-                    # just return after adding them to the current line
-                    curr_line.append(syl)
-                    curr_line_len += len(syl)
-                    return
-                else:
-                    # More syllables to add after this one was added to the line
-                    next_lines.append([*curr_line, syl])
-                    must_clear_line = True
-
-            except AssertionError:
-                # The syls_remaining are unchanged so add content of current
-                # line then continue onward to handle the syllables on a new,
-                # empty line
-                next_lines.append(curr_line)
-
-        # Now, add rest of syllables to new lines
-        while True:
-
-            # next_syl will raise AssertionError if could not fit a
-            # syllable on the line
-            next_syllable, syls_remaining = next_syl(syls_remaining, width(len(lines) + len(next_lines)))
-
-            next_lines.append([next_syllable])
-
-            if len(syls_remaining) == 0:
-                break
-
-        # Successfully added syllables
-
-        lines.extend(next_lines[:-1])
-        curr_line = next_lines[-1]
-        curr_line_len = text_len(curr_line)
-
-    def add_word(word:str):
-        """
-        Adds the given word to the current line or next line or next few lines
-            (depending on how much it needs to be cut up to fit the current width).
-        """
-        nonlocal lines
-        nonlocal curr_line
-        nonlocal curr_line_len
-        nonlocal hyphen_char
-        nonlocal hyphen_char_len
-        word_len = len(word)
-
-        if len(curr_line) == 0:
-            # There is nothing else on the current line
-
-            if word_len > width():
-                # Word itself is too long for the width so put pieces of it onto
-                # line instead
-
-                try:
-                    add_syllables(word, empty_line_break_word)
-                except AssertionError:
-                    # Could not add syllables as they are -- at least one was
-                    # too long for the width of the screen. Just add as much text
-                    # at a time as possible because breaking it into syllables
-                    # isn't enough -- have to break it down more
-
-                    if width() <= hyphen_char_len:
-                        # Not enough width for hyphens so just ignore them and
-                        # put as much of the word on each line as possible
-                        curr_i = 0
-                        word_len = len(word)
-                        while curr_i < word_len:
-                            next_i = min(curr_i + width(), word_len)
-                            lines.append([word[curr_i:next_i]])
-                            curr_i = next_i
-                    else:
-                        # Enough width for hyphens between text
-
-                        curr:str = word
-                        while True:
-                            no_hyphen_width = len(curr) - (len(curr) - width())
-                            with_hyphen_width = no_hyphen_width - hyphen_char_len
-                            use_hyphen = False
-
-                            # If, without the hyphen, you can fit the rest of
-                            # the current string then fit the rest of the
-                            # current string, otherwise fit as much as possible
-                            # with a hyphen after it
-                            if no_hyphen_width >= len(curr) and curr_line_len + no_hyphen_width <= width():
-                                i = min(no_hyphen_width, len(curr))
-                            else:
-                                i = with_hyphen_width
-                                use_hyphen = True
-
-                            prefix, suffix = curr[:i], curr[i:]
-
-                            if len(suffix) > 0:
-                                curr_line.append(prefix + (hyphen_char * use_hyphen))
-                                new_line()
-                            else:
-                                curr_line.append(prefix)
-                                curr_line_len += len(prefix)
-                                break
-                            curr = suffix
-
-            else:
-                # Word can be appended to the current line, perhaps as sole word
-                # on the line
-                curr_line.append(word)
-                curr_line_len += word_len
-        else:
             # There are other words on the line already
 
-            if curr_line_len + space + word_len > width():
-                # Cannot add it to the current line as one piece with 1 space
-                # before it so cut it up into syllables
-                try:
-                    add_syllables(word, end_line_break_word)
-                except AssertionError:
-                    new_line()
-                    add_word(word)
-                    return
-
-            else:
+            if curr_line_len + space + word_len <= width(len(lines)):
                 # Can add it to the line in one piece
                 curr_line.append(word)
                 curr_line_len += space + word_len
-
-    for word in words:
-        add_word(word)
+                continue
+
+            # Cannot add it to the current line as one piece with 1 space
+            # before it so cut it up into syllables (a word that is never
+            # broken up can only go on the next line)
+            if break_at_end:
+                res = _add_syllables(end_line_break_word(word),
+                        curr_line, curr_line_len, len(lines), width,
+                        hyphen_char, hyphen_char_len)
+                if res is not None:
+                    syl, next_lines = res
+                    if len(next_lines) == 0:
+                        # All syllables could be put on the current line
+                        curr_line.append(syl)
+                        curr_line_len += len(syl)
+                    else:
+                        lines.extend(next_lines[:-1])
+                        curr_line = next_lines[-1]
+                        curr_line_len = len(syl) # the last line only holds the last syllable
+                    continue
+
+            # Could not fit it at the end of this line so start a new line
+            # and add it there instead
+            lines.append(curr_line)
+            curr_line = []
+            curr_line_len = 0
+
+        # There is nothing else on the current line
+
+        if word_len <= width(len(lines)):
+            # Word can be appended to the current line, perhaps as sole word
+            # on the line
+            curr_line.append(word)
+            curr_line_len += word_len
+            continue
+
+        # Word itself is too long for the width so put pieces of it onto
+        # line instead (a word that is never broken up is already known
+        # to be too long so skip straight to breaking it down more)
+        if break_when_empty:
+            res = _add_syllables(empty_line_break_word(word),
+                    curr_line, curr_line_len, len(lines), width,
+                    hyphen_char, hyphen_char_len)
+            if res is not None:
+                syl, next_lines = res
+                lines.extend(next_lines[:-1])
+                curr_line = next_lines[-1]
+                curr_line_len = len(syl) # the last line only holds the last syllable
+                continue
+
+        # Could not add syllables as they are -- at least one was
+        # too long for the width of the screen. Just add as much text
+        # at a time as possible because breaking it into syllables
+        # isn't enough -- have to break it down more
+
+        if width(len(lines)) <= hyphen_char_len:
+            # Not enough width for hyphens so just ignore them and
+            # put as much of the word on each line as possible
+            curr_i = 0
+            while curr_i < word_len:
+                next_i = curr_i + width(len(lines)) # slicing stops at the end of the word
+                lines.append([word[curr_i:next_i]])
+                curr_i = next_i
+        else:
+            # Enough width for hyphens between text
+
+            curr:str = word
+            while True:
+                line_width = width(len(lines))
+
+                if len(curr) <= line_width:
+                    # The rest of the current string fits on the line
+                    curr_line.append(curr)
+                    curr_line_len += len(curr)
+                    break
+
+                # Fit as much as possible with a hyphen after it
+                i = line_width - hyphen_char_len
+                curr_line.append(curr[:i] + hyphen_char)
+                lines.append(curr_line)
+                curr_line = []
+                curr_line_len = 0
+                curr = curr[i:]
 
     if len(curr_line) > 0:
         lines.append(curr_line)
 
+    if return_lens:
+        return lines, [sum(map(len, line)) for line in lines]
     return lines
 
 
@@ -299,6 +333,21 @@ def rigid_greedy_break(
 # =============================================================================
 
 
+class _Fills(dict):
+    """
+    Maps a fill length to the fill of that length, building each fill only the
+        first time it is asked for so that lines with the same amount of fill
+        share it.
+    """
+    def __init__(self, fill_char:str):
+        super().__init__()
+        self.fill_char = fill_char
+
+    def __missing__(self, n:int) -> str:
+        fill = self[n] = self.fill_char * n
+        return fill
+
+
 def rigid_left_justify(
         paragraph:List[List[str]],
         width:Callable[[int], int],
@@ -309,11 +358,13 @@ def rigid_left_justify(
     """
     Left justifies the given paragraph.
     """
-    text = StringIO()
-    for i, line in enumerate(paragraph):
-        line_str = space_char.join(line)
-        text.write(line_str + (fill_char * (width(i) - len(line_str))) + line_end)
-    return text.getvalue()
+    if len(fill_char) == 1 and len(paragraph) > 0:
+        return line_end.join([line_str.ljust(width(i), fill_char)
+                for i, line_str in enumerate(map(space_char.join, paragraph))]) + line_end
+
+    fills = _Fills(fill_char)
+    return ''.join([line_str + fills[max(width(i) - len(line_str), 0)] + line_end
+            for i, line_str in enumerate(map(space_char.join, paragraph))])
 
 
 def rigid_right_justify(
@@ -326,11 +377,13 @@ def rigid_right_justify(
     """
     Right justifies the given paragraph.
     """
-    text = StringIO()
-    for i, line in enumerate(paragraph):
-        line_str = space_char.join(line)
-        text.write((fill_char * (width(i) - len(line_str))) + line_str + line_end)
-    return text.getvalue()
+    if len(fill_char) == 1 and len(paragraph) > 0:
+        return line_end.join([line_str.rjust(width(i), fill_char)
+                for i, line_str in enumerate(map(space_char.join, paragraph))]) + line_end
+
+    fills = _Fills(fill_char)
+    return ''.join([fills[max(width(i) - len(line_str), 0)] + line_str + line_end
+            for i, line_str in enumerate(map(space_char.join, paragraph))])
 
 
 def rigid_center_justify(
@@ -348,25 +401,27 @@ def rigid_center_justify(
         whether to put the extra whitespace on the left or right of the text.
         If not biased right, then the whitespace will be biased left.
     """
-    text = StringIO()
-    for i, line in enumerate(paragraph):
-        line_str = space_char.join(line)
-        fill = (fill_char * (width(i) - len(line_str)))
-
-        # Add fill either biased right or left
-        if bias == 'right':
-            fill_i = math.ceil(len(fill) / 2)
-        elif bias == 'random':
-            if random.randint(0, 1):
-                fill_i = math.ceil(len(fill) / 2)
-            else:
-                fill_i = len(fill) // 2
-        else:
-            # bias left
-            fill_i = len(fill) // 2
+    single_fill_char = len(fill_char) == 1
+    fills = None if single_fill_char else _Fills(fill_char)
 
-        text.write(fill[:fill_i] + line_str + fill[fill_i:] + line_end)
-    return text.getvalue()
+    text:List[str] = []
+    for i, line_str in enumerate(map(space_char.join, paragraph)):
+        line_width = width(i)
+        fill_len = max(line_width - len(line_str), 0)
+
+        # Add fill either biased right or left i.e. round the fill on the
+        # left up or down
+        round_up = random.randint(0, 1) if bias == 'random' else (bias == 'right')
+
+        if single_fill_char:
+            fill_i = (fill_len + round_up) >> 1
+            text.append(line_str.rjust(len(line_str) + fill_i, fill_char).ljust(line_width, fill_char) + line_end)
+        else:
+            # The fill is split by character, not by repetition of fill_char
+            fill = fills[fill_len]
+            fill_i = (len(fill) + round_up) >> 1
+            text.append(fill[:fill_i] + line_str + fill[fill_i:] + line_end)
+    return ''.join(text)
 
 
 def rigid_full_justify(
@@ -376,7 +431,8 @@ def rigid_full_justify(
         fill_char:str=' ',
         line_end:str='\n',
         bias:Literal['left', 'right', 'random']='random',
-        last_line_justify:Literal['left', 'right', 'center', 'full']='left'
+        last_line_justify:Literal['left', 'right', 'center', 'full']='left',
+        line_lens:Optional[List[int]]=None,
     ) -> str:
     """
     Left-right justifies the given paragraph.
@@ -391,62 +447,51 @@ def rigid_full_justify(
         extra whitespace to be added from right to left, and 'random' will randomly
         distribute the extra whitespace among the possible positions.
 
+    line_lens: The number of characters (not counting spaces) on each line of
+        the paragraph, as returned by rigid_greedy_break when return_lens=True.
+        If not given, they are counted from the paragraph.
     """
-    text = StringIO()
+    if line_lens is None:
+        line_lens = [sum(map(len, line)) for line in paragraph] # number of non-whitespace characters on each line
+
+    text:List[str] = []
     for i, line in enumerate(paragraph):
 
         if i == len(paragraph) - 1:
             # left-justify last line
-            text.write(rigid_justify([line], lambda _: width(i), last_line_justify, space_char, fill_char, line_end))
+            text.append(rigid_justify([line], lambda _: width(i), last_line_justify, space_char, fill_char, line_end))
         else:
             # not last line so properly left-right justify it
-            fill_len = max(width(i) - text_len(line), 0) # how many fill characters in total there need to be for this line
+            fill_len = max(width(i) - line_lens[i], 0) # how many fill characters in total there need to be for this line
             num_positions = len(line) - 1 # positions that can be filled with whitespace
-            start_spaces_per_pos = (fill_len // max(num_positions, 1))
+            # how many spaces every position gets and how much more length
+            # there is to fill after that
+            start_spaces_per_pos, fill_len_left = divmod(fill_len, max(num_positions, 1))
             positions:List[str] = [space_char * start_spaces_per_pos] * num_positions # the positions of whitespace between words
-            fill_len_left = fill_len - (start_spaces_per_pos * num_positions) # how much more length there is to fill
 
             if num_positions > 0:
                 if bias == 'random':
-                    while fill_len_left > 0:
-                        unused = [i for i in range(len(positions))]
-
-                        while len(unused) > 0:
-                            i = unused.pop(random.randint(0, len(unused) - 1))
-                            positions[i] += space_char
-                            fill_len_left -= 1
-
-                            if fill_len_left <= 0:
-                                break
+                    # fill_len_left < num_positions so each position gets at
+                    # most 1 of the extra whitespace
+                    for j in random.sample(range(num_positions), fill_len_left):
+                        positions[j] += space_char
 
                 elif bias == 'left':
-                    while fill_len_left > 0:
-                        for i in range(len(positions)):
-                            if fill_len_left <= 0: break
-
-                            positions[i] += space_char
-                            fill_len_left -= 1
+                    # the leftmost positions each get 1 of the extra whitespace
+                    positions[:fill_len_left] = [space_char * (start_spaces_per_pos + 1)] * fill_len_left
 
                 elif bias == 'right':
-                    while fill_len_left > 0:
-                        for i in range(len(positions) - 1, -1, -1):
-                            if fill_len_left <= 0: break
-
-                            positions[i] += space_char
-                            fill_len_left -= 1
+                    # the rightmost positions each get 1 of the extra whitespace
+                    positions[num_positions - fill_len_left:] = [space_char * (start_spaces_per_pos + 1)] * fill_len_left
 
                 else:
                     raise AssertionError(f'Unknown bias option "{bias}"')
 
             positions.append('') # so that the number of positions is same length as line for the zip() function
 
-            for word, space_chars in zip(line, positions):
-                text.write(word)
-                text.write(space_chars)
+            text.append(''.join([word + space_chars for word, space_chars in zip(line, positions)]) + line_end)
 
-            text.write(line_end)
-
-    return text.getvalue()
+    return ''.join(text)
 
 
 def rigid_justify(
@@ -461,6 +506,7 @@ def rigid_justify(
         # Params for specific justify methods
         bias:Literal['left', 'right', 'random']='left',
         last_line_justiyf:Literal['left', 'right', 'center', 'full']='left',
+        line_lens:Optional[List[int]]=None,
     ) -> str:
     """
     Justifies and returns the given paragraph as a string, assuming that it is
@@ -497,6 +543,9 @@ def rigid_justify(
         added from right to left so right positions get more whitespace than
         left positions; and bias='random' means that the extra whitespace should
         be randomly distributed among the positions.
+
+    line_lens: The number of characters (not counting spaces) on each line of
+        the paragraph (only used for full justification).
     """
     if   justify == 'left':
         return rigid_left_justify(paragraph, width, space_char, fill_char, line_end)
@@ -505,7 +554,7 @@ def rigid_justify(
     elif justify == 'center':
         return rigid_center_justify(paragraph, width, space_char, fill_char, line_end, bias)
     elif justify == 'full':
-        return rigid_full_justify(paragraph, width, space_char, fill_char, line_end, bias, last_line_justiyf)
+        return rigid_full_justify(paragraph, width, space_char, fill_char, line_end, bias, last_line_justiyf, line_lens)
     else:
         raise AssertionError(f'Illegal Format Error: justify="{justify}" is an unknown justification option')
 
@@ -0,0 +1,206 @@
+"""
+Regression tests for knuth_plass3. Run with `python -m pytest` from this
+    directory.
+"""
+import pytest
+
+import knuth_plass3 as kp
+
+def test_forced_break_ends_line():
+    # '@' is a forced break so a line must end there even though the line
+    #   before it has to be stretched more than the tolerance allows
+    text = 'aaa bbb ccc @ ddd eee'
+    par = kp.make_paragraph(text)
+    breaks = par.calc_knuth_plass_breaks(40)
+    assert [brk.position for brk in breaks] == [text.index('@'), len(par) - 1]
+    lines = kp.str_for_breaks(par, breaks).split('\n')
+    assert [line.rstrip() for line in lines] == ['aaa bbb ccc', 'ddd eee', '']
+
+def test_forced_break_mid_paragraph():
+    text = 'word ' * 50 + '@' + 'other ' * 30
+    for line_lengths in (60, [50, 40, 30]):
+        par = kp.make_paragraph(text)
+        breaks = par.calc_knuth_plass_breaks(line_lengths)
+        assert text.index('@') in [brk.position for brk in breaks]
+
+        # The lines after the forced break only hold the text after it
+        lines = kp.str_for_breaks(par, breaks).split('\n')
+        assert lines[0].startswith('word')
+        assert not any('word' in line and 'other' in line for line in lines)
+
+def test_forced_break_never_overfull():
+    # A forced break only lets through lines that are too short, never a
+    #   line that is too long to fit (which has no shrink, so r = INF)
+    for text, width in (('aaa@bbbbbbbbbbbbbbbbbbbbbbbb', 10),
+                        ('hello world@abcdefghijklmnopqrstuvwxyz@foo bar', 12)):
+        par = kp.make_paragraph(text)
+        with pytest.raises(AssertionError):
+            par.calc_knuth_plass_breaks(width)
+
+def test_unbreakable_word_too_long():
+    par = kp.make_paragraph('abcdefghijklmnopqrstuvwxyz')
+    with pytest.raises(AssertionError):
+        par.calc_knuth_plass_breaks(13)
+
+def test_changes_are_seen_by_next_calc():
+    # Nothing is cached between runs of calc_knuth_plass_breaks, so changing
+    #   the paragraph after one run changes the breaks of the next
+    def build(glue_width=2):
+        par = kp.KnuthPlassParagraph()
+        for i in range(27):
+            if i % 2:
+                par.append(kp.Glue(1, glue_width if i == 1 else 2, 1), ' ')
+            else:
+                par.append(kp.Box(1), 'a')
+        par.append_std_end()
+        return par
+
+    par = build()
+    assert [brk.position for brk in par.calc_knuth_plass_breaks(20)] == [19, 29]
+    par.specs[1] = kp.Glue(1, 4, 1)
+    breaks = par.calc_knuth_plass_breaks(20)
+    assert [brk.position for brk in breaks] == \
+            [brk.position for brk in build(4).calc_knuth_plass_breaks(20)] == [17, 29]
+
+    # A forced break put in place of a Penalty that was not one, and then
+    #   the same Penalty made not forced again
+    par.specs[-3] = kp.Penalty(0, -kp.INF, False)
+    assert [brk.position for brk in par.calc_knuth_plass_breaks(20)] == [15, 27, 29]
+    par.specs[-3].penalty = kp.INF
+    assert [brk.position for brk in par.calc_knuth_plass_breaks(20)] == [17, 29]
+
+    # Changing a Spec in place
+    par.specs[1].width = 2
+    assert [brk.position for brk in par.calc_knuth_plass_breaks(20)] == [19, 29]
+
+    # The cached line texts are only kept until the next run
+    assert par.line_text(breaks[0]).startswith('a a')
+    par.vals[0] = 'x'
+    breaks = par.calc_knuth_plass_breaks(20)
+    assert par.line_text(breaks[0]).startswith('x a')
+
+def test_trailing_whitespace_empty_last_line():
+    # Breaking at the trailing space leaves a last line with no Boxes on
+    #   it, which line_contents must not run off the end of the paragraph
+    #   looking for
+    par = kp.make_paragraph('aaa bbb ')
+    breaks = par.calc_knuth_plass_breaks(7)
+    assert [brk.position for brk in breaks] == [7, len(par) - 1]
+    assert list(par.line_contents(breaks[-1])) == []
+    assert kp.str_for_breaks(par, breaks) == 'aaa bbb\n' + ' ' * 7 + '\n'
+
+def test_looseness_line_counts():
+    # Positive looseness sets the paragraph that many lines longer than the
+    #   optimum. This text cannot be set any tighter than the optimum at
+    #   this width so negative looseness keeps the optimum.
+    counts = {}
+    for looseness in (0, 1, 2, -1):
+        par = kp.make_paragraph(kp.medium_long_text)
+        counts[looseness] = len(par.calc_knuth_plass_breaks(60, looseness=looseness, tolerance=3))
+    assert counts == {0: 59, 1: 60, 2: 61, -1: 59}
+
+def test_batch_calc_matches_serial():
+    texts = [kp.medium_long_text, 'aaa bbb ccc @ ddd eee', 'word ' * 40, 'a']
+    pars = [kp.make_paragraph(text) for text in texts] + [kp.KnuthPlassParagraph()]
+
+    batched = kp.batch_calc(pars, [50, 40, 30], tolerance=2, workers=2)
+    serial  = [par.calc_knuth_plass_breaks([50, 40, 30], tolerance=2) for par in pars]
+
+    # Breaks compare by identity so compare their fields (previous breaks
+    #   are covered by every break of the paragraph being compared)
+    assert [[brk[:-1] for brk in breaks] for breaks in batched] == \
+            [[brk[:-1] for brk in breaks] for breaks in serial]
+    assert batched[-1] == []
+
+def test_glue_r_width_follows_changes():
+    glue = kp.Glue(1, 2, 1)
+    glue.stretch = 3
+    glue.shrink = 2
+    assert glue.r_width(1) == 5
+    assert glue.r_width(-1) == 0
+
+def test_penalty_forced_follows_changes():
+    penalty = kp.Penalty(0, 0, False)
+    assert not penalty.forced
+    penalty.penalty = -kp.INF
+    assert penalty.forced and penalty.is_forced_break()
+    penalty.penalty = 50
+    assert not penalty.forced
+
+def test_intern():
+    assert kp.Glue.intern(1, 2, 1) is kp.Glue.intern(1, 2, 1)
+
+    # Arguments that are equal but of different types give different Specs
+    assert kp.Box.intern(1) is not kp.Box.intern(1.0)
+    assert type(kp.Box.intern(1.0).width) is float
+    assert kp.Penalty.intern(0, 0, False) is not kp.Penalty.intern(0, 0, 0)
+    assert type(kp.Penalty.intern(0, 0, 0).flagged) is int
+
+    # Paragraphs build their own Specs so changing one paragraph's Specs
+    #   leaves other paragraphs (and the interned Specs) alone
+    a = kp.make_paragraph('aaa bbb')
+    b = kp.make_paragraph('ccc ddd')
+    assert a.specs[3] is not b.specs[3]
+    a.specs[3].stretch = 0
+    assert b.specs[3].stretch == 1 and kp.Glue.intern(1, 2, 1).stretch == 1
+
+def test_pickle_drops_derived_caches():
+    import pickle
+    par = kp.make_paragraph(kp.medium_long_text)
+    breaks = par.calc_knuth_plass_breaks(60)
+    par.line_text(breaks[0])
+
+    copy = pickle.loads(pickle.dumps(par))
+    assert copy.sum_width is None and copy.sum_stretch is None and copy.sum_shrink is None
+    assert copy.next_box is None and copy.line_texts == {}
+    assert [brk.position for brk in copy.calc_knuth_plass_breaks(60)] == \
+            [brk.position for brk in breaks]
+
+def test_breaks_compare_by_identity():
+    # Comparing breaks at the end of long chains of previous breaks must not
+    #   recurse through the chains
+    def chain(n):
+        brk = None
+        for i in range(n):
+            brk = kp.Break(i, i, 1, 0.0, 0.0, 10, brk)
+        return brk
+
+    a, b = chain(3000), chain(3000)
+    assert a != b
+    assert a == a
+    assert a in {a} and b not in {a}
+
+def test_make_paragraph_from_iterable():
+    def fields(par):
+        return [(spec.t, spec.width, spec.penalty) for spec in par.specs]
+
+    text = 'aaa bbb@ccc~ddd\néé'
+    expected = kp.make_paragraph(text)
+    for chars in (list(text), iter(text), tuple(text)):
+        par = kp.make_paragraph(chars)
+        assert fields(par) == fields(expected)
+        assert par.vals == expected.vals
+
+@pytest.mark.parametrize('string, num_spaces, expected', [
+    ('a b c',        0, 'a b c'),
+    ('a b c',        1, 'a  b c'),
+    ('a b c',        2, 'a  b  c'),
+    ('a b c',        5, 'a    b   c'),
+    ('aa bb cc dd',  2, 'aa  bb  cc dd'),
+    ('one  two',     3, 'one     two'),
+    ('word',         3, 'word   '),
+    (' lead trail ', 2, ' lead  trail  '),
+])
+def test_insert_spaces(string, num_spaces, expected):
+    assert kp.insert_spaces(string, num_spaces) == expected
+
+def test_justify_names():
+    # A justification can be given by its name in any case
+    par = kp.make_paragraph(kp.medium_long_text[:600])
+    breaks = par.calc_knuth_plass_breaks(60)
+    for justify in kp.JUSTIFY:
+        expected = kp.str_for_breaks(par, breaks, justify)
+        for name in (justify.name, justify.name.lower(), justify.name.title()):
+            assert kp.str_for_breaks(par, breaks, name) == expected
+    with pytest.raises(Exception):
+        kp.str_for_breaks(par, breaks, 'middle')
@@ -0,0 +1,128 @@
+"""
+Regression tests for new/rigid_greedy. Run with `python -m pytest` from this
+    directory.
+"""
+import random
+import re
+
+import pytest
+
+from new import rigid_greedy as rg
+
+def syl3(word):
+    # Splits a word into syllables of 3 characters
+    return [word[i:i+3] for i in range(0, len(word), 3)]
+
+TEXT = 'a bb ccc dddd mistletoe extraordinarily x yy internationalization zz'
+
+def width(i):
+    return 9 if i % 2 == 0 else 12
+
+def lines_str(lines):
+    return ' / '.join(' '.join(line) for line in lines)
+
+# The lines of TEXT for each (end_line_break_word, empty_line_break_word) and
+#   hyphen_char, as given by the original implementation
+BREAK_CASES = [
+    (rg.never_break_word, rg.never_break_word, '',   'a bb ccc / dddd / mistletoe / extraordinar / ily x yy / internationa / lization / zz'),
+    (rg.never_break_word, rg.never_break_word, '-',  'a bb ccc / dddd / mistletoe / extraordina- / rily x yy / internation- / alization / zz'),
+    (rg.never_break_word, rg.never_break_word, '--', 'a bb ccc / dddd / mistletoe / extraordin-- / arily x / yy / interna-- / tionalizat-- / ion zz'),
+    (syl3,                rg.never_break_word, '',   'a bb ccc / dddd mistle / toe ext / raordinarily / x yy int / ernationaliz / ation zz'),
+    (syl3,                rg.never_break_word, '-',  'a bb ccc / dddd mistle- / toe ext- / raordinarily / x yy int- / ernationa- / lization / zz'),
+    (syl3,                rg.never_break_word, '--', 'a bb ccc / dddd mis-- / tletoe / extraordi-- / narily x / yy intern-- / ationa-- / lization zz'),
+    (rg.never_break_word, syl3,                '',   'a bb ccc / dddd / mistletoe / extraordinar / ily x yy / internationa / lization / zz'),
+    (rg.never_break_word, syl3,                '-',  'a bb ccc / dddd / mistletoe / extraordi- / narily x / yy / intern- / ationaliz- / ation zz'),
+    (rg.never_break_word, syl3,                '--', 'a bb ccc / dddd / mistletoe / extraordi-- / narily x / yy / intern-- / ationaliz-- / ation zz'),
+    (syl3,                syl3,                '',   'a bb ccc / dddd mistle / toe ext / raordinarily / x yy int / ernationaliz / ation zz'),
+    (syl3,                syl3,                '-',  'a bb ccc / dddd mistle- / toe ext- / raordinarily / x yy int- / ernationa- / lization / zz'),
+    (syl3,                syl3,                '--', 'a bb ccc / dddd mis-- / tletoe / extraordi-- / narily x / yy intern-- / ationa-- / lization zz'),
+]
+
+@pytest.mark.parametrize('end_break, empty_break, hyphen_char, expected', BREAK_CASES)
+def test_break_callbacks_and_hyphens(end_break, empty_break, hyphen_char, expected):
+    lines = rg.rigid_greedy_break(TEXT, width, end_break, empty_break, hyphen_char)
+    assert lines_str(lines) == expected
+
+@pytest.mark.parametrize('line_width, hyphen_char, expected', [
+    (1, '',   'a / b / c / d / e / f / g / h / i'),
+    (1, '-',  'a / b / c / d / e / f / g / h / i'),
+    (1, '--', 'a / b / c / d / e / f / g / h / i'),
+    (2, '',   'ab / cd / ef / g / hi'),
+    (2, '-',  'a- / b- / c- / d- / e- / fg / hi'),
+    (2, '--', 'ab / cd / ef / g / hi'),
+    (3, '',   'abc / def / g / hi'),
+    (3, '-',  'ab- / cd- / efg / hi'),
+    (3, '--', 'a-- / b-- / c-- / d-- / efg / hi'),
+])
+def test_narrow_lines(line_width, hyphen_char, expected):
+    # Lines too narrow for the syllables fall back to splitting by character
+    lines = rg.rigid_greedy_break('abcdefg hi', lambda _: line_width, syl3, syl3, hyphen_char)
+    assert lines_str(lines) == expected
+
+@pytest.mark.parametrize('text, line_widths', [
+    (TEXT, width),
+    (TEXT, lambda _: 20),
+    (TEXT, lambda i: 30 - 5 * (i % 4)),
+    ('one two three four five six seven eight nine ten', lambda _: 5),
+    ('a ' * 50, lambda i: i % 7),
+    ('', width),
+])
+def test_packing_matches_general_path(text, line_widths):
+    # When no word is ever broken, only the word lengths are packed. A
+    #   callback that also never breaks words (but is not never_break_word)
+    #   goes through the general path instead, which must agree with it.
+    def same_as_never(word):
+        return [word]
+
+    packed = rg.rigid_greedy_break(text, line_widths, return_lens=True)
+    general = rg.rigid_greedy_break(text, line_widths, same_as_never, same_as_never, return_lens=True)
+    assert packed == general
+    lines, lens = packed
+    assert lens == [sum(map(len, line)) for line in lines]
+
+
+JUSTIFY_TEXT = ' '.join([TEXT] * 3)
+
+@pytest.mark.parametrize('bias', ['left', 'right', 'random'])
+def test_full_justify_widths(bias):
+    # Every line with more than one word (other than the last line) is filled
+    #   to exactly its width, with the gaps between its words differing by at
+    #   most one space and the wider gaps on the side given by the bias
+    random.seed(1234)
+    lines, lens = rg.rigid_greedy_break(JUSTIFY_TEXT, width, return_lens=True)
+    out = rg.rigid_full_justify(lines, width, bias=bias, line_lens=lens).split('\n')
+    assert out.pop() == ''
+    assert len(out) == len(lines)
+
+    for i, (line, words) in enumerate(zip(out[:-1], lines)):
+        assert line.split() == words
+        if len(words) == 1:
+            assert line == words[0]
+            continue
+        assert len(line) == width(i)
+
+        gaps = [len(gap) for gap in re.findall(' +', line)]
+        assert max(gaps) - min(gaps) <= 1
+        if bias == 'left':
+            assert gaps == sorted(gaps, reverse=True)
+        elif bias == 'right':
+            assert gaps == sorted(gaps)
+
+    # The last line is left justified
+    assert out[-1] == ' '.join(lines[-1]).ljust(width(len(lines) - 1))
+
+@pytest.mark.parametrize('justify', ['left', 'right', 'center'])
+@pytest.mark.parametrize('fill_char', [' ', '.', '-=', 'abc'])
+def test_justify_fill_widths(justify, fill_char):
+    # The fill is fill_char repeated once for every missing character, so
+    #   lines are exactly their width for single character fills and longer
+    #   by the extra characters of longer fills
+    random.seed(1234)
+    lines = rg.rigid_greedy_break(JUSTIFY_TEXT, width)
+    out = rg.rigid_justify(lines, width, justify, fill_char=fill_char, bias='random').split('\n')
+    assert out.pop() == ''
+    assert len(out) == len(lines)
+    for i, (line, words) in enumerate(zip(out, lines)):
+        line_str = ' '.join(words)
+        assert len(line) == len(line_str) + (width(i) - len(line_str)) * len(fill_char)
+        assert line_str in line